@@ -1,5 +1,34 @@
+import functools
 import random
-import copy
+from collections import defaultdict, deque
+
+import numpy as np
+
+# Offsets of the eight cells surrounding a cell
+_NEIGHBOR_OFFSETS = tuple(
+    (di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if (di, dj) != (0, 0)
+)
+
+@functools.lru_cache(maxsize=None)
+def _board_tables(height, width):
+    """
+    Returns (neighbor_masks, bit_to_cell) for a board geometry:
+    a neighborhood bitmask per cell and the bit-to-(i, j) decode table.
+    Computed once per (height, width) and shared across all game and
+    AI instances of that size.
+    """
+    masks = [0] * (height * width)
+    for i in range(height):
+        for j in range(width):
+            mask = 0
+            for di, dj in _NEIGHBOR_OFFSETS:
+                r = i + di
+                c = j + dj
+                if 0 <= r < height and 0 <= c < width:
+                    mask |= 1 << (r * width + c)
+            masks[i * width + j] = mask
+    bit_to_cell = tuple((k // width, k % width) for k in range(height * width))
+    return tuple(masks), bit_to_cell
 
 class Minesweeper():
     """
@@ -11,23 +40,22 @@ class Minesweeper():
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
         # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        self.board = np.zeros((height, width), dtype=np.bool_)
+
+        # Add mines randomly, sampling flat indices without replacement
+        flat = random.sample(range(height * width), mines)
+        self.mines = {(k // width, k % width) for k in flat}
+        self.board.flat[flat] = True
+
+        # Bit-packed copy of the board (bit i*width+j set when (i, j)
+        # is a mine) plus the shared neighborhood masks, so nearby_mines
+        # is a single AND + popcount
+        self._bits = 0
+        for (i, j) in self.mines:
+            self._bits |= 1 << (i * width + j)
+        self._neighbor_mask, _ = _board_tables(height, width)
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -37,15 +65,18 @@ class Minesweeper():
         Prints a text-based representation
         of where mines are located.
         """
+        sep = "--" * self.width + "-"
+        lines = []
         for i in range(self.height):
-            print("--" * self.width + "-")
-            for j in range(self.width):
-                if self.board[i][j]:
-                    print("|X", end="")
-                else:
-                    print("| ", end="")
-            print("|")
-        print("--" * self.width + "-")
+            lines.append(sep)
+            lines.append(
+                "".join(
+                    "|X" if self.board[i][j] else "| "
+                    for j in range(self.width)
+                ) + "|"
+            )
+        lines.append(sep)
+        print("\n".join(lines))
 
     def is_mine(self, cell):
         i, j = cell
@@ -58,23 +89,9 @@ class Minesweeper():
         not including the cell itself.
         """
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        # Popcount of the mine bitmap masked to the cell's neighborhood
+        i, j = cell
+        return (self._bits & self._neighbor_mask[i * self.width + j]).bit_count()
 
     def won(self):
         """
@@ -88,24 +105,68 @@ class Sentence():
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    Cells are stored as an int bitmask (bit i*width+j set when (i, j)
+    belongs to the sentence), so subset tests, differences and
+    cardinalities are single machine-word operations. The board
+    geometry is shared class-level state set up via configure().
     """
 
+    # Board geometry for encoding/decoding cell bits; set by configure()
+    width = None
+    _bit_to_cell = ()
+
+    @classmethod
+    def configure(cls, height, width):
+        """
+        Sets the board geometry used to map cells to bits.
+        """
+        cls.width = width
+        _, cls._bit_to_cell = _board_tables(height, width)
+
+    @classmethod
+    def to_cells(cls, mask):
+        """
+        Decodes a bitmask into a list of (i, j) cells.
+        """
+        cells = []
+        while mask:
+            low = mask & -mask
+            cells.append(cls._bit_to_cell[low.bit_length() - 1])
+            mask ^= low
+        return cells
+
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        if isinstance(cells, int):
+            self.cells = cells
+        else:
+            mask = 0
+            for (i, j) in cells:
+                mask |= 1 << (i * self.width + j)
+            self.cells = mask
         self.count = count
 
+    def key(self):
+        """
+        Returns the hashable (cells, count) identity of the sentence.
+        """
+        return (self.cells, self.count)
+
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        return hash(self.key())
+
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{set(self.to_cells(self.cells))} = {self.count}"
 
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
         """
-        if len(self.cells) == self.count:
-            return self.cells
+        if self.cells.bit_count() == self.count:
+            return set(self.to_cells(self.cells))
         return None
 
     def known_safes(self):
@@ -113,7 +174,7 @@ class Sentence():
         Returns the set of all cells in self.cells known to be safe.
         """
         if self.count == 0:
-            return self.cells
+            return set(self.to_cells(self.cells))
         return None
 
     def mark_mine(self, cell):
@@ -121,13 +182,11 @@ class Sentence():
         Updates internal knowledge representation given the fact that
         a cell is known to be a mine.
         """
-        new_set = set()
-        for c in self.cells:
-            if c != cell:
-                new_set.add(c)
-            else:
-                self.count -= 1
-        self.cells = new_set
+        i, j = cell
+        mask = 1 << (i * self.width + j)
+        if self.cells & mask:
+            self.cells &= ~mask
+            self.count -= 1
 
 
     def mark_safe(self, cell):
@@ -135,11 +194,10 @@ class Sentence():
         Updates internal knowledge representation given the fact that
         a cell is known to be safe.
         """
-        new_set = set()
-        for c in self.cells:
-            if c != cell:
-                new_set.add(c)
-        self.cells = new_set
+        i, j = cell
+        mask = 1 << (i * self.width + j)
+        if self.cells & mask:
+            self.cells &= ~mask
 
 
 class MinesweeperAI():
@@ -153,6 +211,9 @@ class MinesweeperAI():
         self.height = height
         self.width = width
 
+        # Set up the cell-to-bit mapping shared by all sentences
+        Sentence.configure(height, width)
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -160,8 +221,34 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
+        # Safe cells that have not been played yet, kept up to date
+        # incrementally so make_safe_move is O(1)
+        self._available_safes = set()
+
+        # List of sentences about the game known to be true, plus the
+        # set of their (cells, count) keys for O(1) duplicate checks
         self.knowledge = []
+        self._kb_keys = set()
+
+        # Every cell on the board, for sampling random moves
+        self._all_cells = frozenset(
+            (i, j) for i in range(height) for j in range(width)
+        )
+
+        # Index mapping each cell to the sentences containing it, so
+        # marking a cell only touches the sentences it appears in
+        self._cell_index = defaultdict(set)
+
+        # Work queue of sentences mutated by marking, waiting to be
+        # checked for newly resolvable cells
+        self._dirty = deque()
+
+    def _index_sentence(self, sentence):
+        """
+        Registers a sentence in the cell index.
+        """
+        for c in sentence.to_cells(sentence.cells):
+            self._cell_index[c].add(sentence)
 
     def mark_mine(self, cell):
         """
@@ -169,8 +256,11 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        for sentence in self._cell_index.pop(cell, ()):
+            self._kb_keys.discard(sentence.key())
             sentence.mark_mine(cell)
+            self._kb_keys.add(sentence.key())
+            self._dirty.append(sentence)
 
     def mark_safe(self, cell):
         """
@@ -178,8 +268,13 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        if cell not in self.moves_made:
+            self._available_safes.add(cell)
+        for sentence in self._cell_index.pop(cell, ()):
+            self._kb_keys.discard(sentence.key())
             sentence.mark_safe(cell)
+            self._kb_keys.add(sentence.key())
+            self._dirty.append(sentence)
 
     def add_knowledge(self, cell, count):
         """
@@ -198,89 +293,134 @@ class MinesweeperAI():
         """
         #Add cell to made moves and mark as safe
         self.moves_made.add(cell)
+        self._available_safes.discard(cell)
         self.mark_safe(cell)
 
         #Add sentence to knowledge base considering known safes and mines
         i, j = cell
-        cells = []
-        for row in range(i-1, i+2):
-            for col in range(j-1, j+2):
-                if row >= 0 and row < self.height and col >= 0 and col < self.width:
-                    if (row, col) == cell:
-                        continue
-                    if (row, col) in self.mines:
-                        count -= 1
-                    if (row, col) not in self.mines and (row, col) not in self.safes:
-                        cells.append((row, col))
+        cells = 0
+        for di, dj in _NEIGHBOR_OFFSETS:
+            row = i + di
+            col = j + dj
+            if 0 <= row < self.height and 0 <= col < self.width:
+                if (row, col) in self.mines:
+                    count -= 1
+                elif (row, col) not in self.safes:
+                    cells |= 1 << (row * self.width + col)
+        #A fully determined sentence (all safe or all mines) resolves
+        #on the spot; subset inference could add nothing beyond the
+        #marks, so skip the pairwise loop entirely. Common for the
+        #zero-count cells revealed during open-area cascades.
+        if count == 0 or count == cells.bit_count():
+            if count == 0:
+                for safe in Sentence.to_cells(cells):
+                    self.mark_safe(safe)
+            else:
+                for mine in Sentence.to_cells(cells):
+                    self.mark_mine(mine)
+            self.add_known_safes_and_mines()
+            return
+
         new_sentence = Sentence(cells, count)
-        self.knowledge.append(new_sentence)
+        if new_sentence.key() not in self._kb_keys:
+            self.knowledge.append(new_sentence)
+            self._index_sentence(new_sentence)
+            self._kb_keys.add(new_sentence.key())
+
+        #Make new inferences based on knowledge base. Only sentences
+        #sharing at least one cell with the new one can be in a subset
+        #relation, so pull candidates from the cell index instead of
+        #scanning the whole knowledge base
+        candidates = set().union(
+            *(self._cell_index[c] for c in new_sentence.to_cells(new_sentence.cells))
+        )
+        candidates.discard(new_sentence)
 
-        #Make new inferences based on knowledge base
         inferences = []
-        for sentence in self.knowledge:
-            if sentence == new_sentence:
+        inf_keys = set()
+        for sentence in candidates:
+
+            #Only the smaller sentence can be a subset of the larger,
+            #so orient the pair once instead of testing both directions
+            if sentence.cells.bit_count() <= new_sentence.cells.bit_count():
+                small, big = sentence, new_sentence
+            else:
+                small, big = new_sentence, sentence
+            if small.cells & big.cells != small.cells:
+                continue
+
+            diff = big.cells & ~small.cells
+            #Equal cells carry nothing new
+            if not diff:
                 continue
+            #Mark new safe cells
+            if small.count == big.count:
+                for safe in Sentence.to_cells(diff):
+                    self.mark_safe(safe)
+            #Mark new mines
+            elif diff.bit_count() == big.count - small.count:
+                for mine in Sentence.to_cells(diff):
+                    self.mark_mine(mine)
+            #Add new inference, unless already known or already inferred
+            else:
+                key = (diff, big.count - small.count)
+                if key not in self._kb_keys and key not in inf_keys:
+                    inf_keys.add(key)
+                    inferences.append(Sentence(diff, big.count - small.count))
 
-            if sentence.cells.issubset(new_sentence.cells):
-                diff = new_sentence.cells.difference(sentence.cells)
-                #Mark new safe cells
-                if sentence.count == new_sentence.count:
-                    for safe in diff:
-                        self.mark_safe(safe)
-                #Mark new mines
-                elif len(diff) == new_sentence.count - sentence.count:
-                    for mine in diff:
-                        self.mark_mine(mine)
-                #Add new inference
-                else:
-                    inference = Sentence(diff, new_sentence.count - sentence.count)
-                    inferences.append(inference)
-
-            elif new_sentence.cells.issubset(sentence.cells):
-                diff = sentence.cells.difference(new_sentence.cells)
-                #Mark new safe cells
-                if sentence.count == new_sentence.count:
-                    for safe in diff:
-                        self.mark_safe(safe)
-                #Mark new mines
-                elif len(diff) == sentence.count - new_sentence.count:
-                    for mine in diff:
-                        self.mark_mine(mine)
-                #Add new inference
-                else:
-                    inference = Sentence(diff, sentence.count - new_sentence.count)
-                    inferences.append(inference)
-
-        #Extend knowledge base and remove duplicate sentences    
+        #Extend knowledge base with the new inferences
         self.knowledge.extend(inferences)
-        self.remove_duplicates()
+        self._kb_keys |= inf_keys
+        for inference in inferences:
+            self._index_sentence(inference)
 
-        #Add new known safe cells and mines after inferences
+        #Resolve known safe cells and mines and drop duplicates
         self.add_known_safes_and_mines()
 
 
-    def remove_duplicates(self):
-        unique_knowledge = []
-        for sentence in self.knowledge:
-            if sentence not in unique_knowledge:
-                unique_knowledge.append(sentence)
-        self.knowledge = unique_knowledge
-
+    def _propagate(self):
+        """
+        Resolves dirty sentences to a fixed point. Marking a resolved
+        sentence's cells mutates the sentences containing them, which
+        re-enter the queue, so cascades cost only the sentences touched.
+        A fully resolved sentence ends up empty and is skipped.
+        """
+        while self._dirty:
+            s = self._dirty.popleft()
+            if not s.cells:
+                continue
+            if s.count == 0:
+                for safe in Sentence.to_cells(s.cells):
+                    self.mark_safe(safe)
+            elif s.count == s.cells.bit_count():
+                for mine in Sentence.to_cells(s.cells):
+                    self.mark_mine(mine)
 
     def add_known_safes_and_mines(self):
+        """
+        Resolves every sentence whose cells are all safe or all mines,
+        then compacts the knowledge base, dropping emptied sentences
+        and duplicates.
+        """
+        # Seed the work queue with sentences that arrived resolved
+        # (marks during inference have already queued the rest)
+        for s in self.knowledge:
+            if s.count == 0 or s.count == s.cells.bit_count():
+                self._dirty.append(s)
+        self._propagate()
+
+        seen = set()
         final_knowledge = []
         for s in self.knowledge:
-            safes = s.known_safes()
-            mines = s.known_mines()
-            if safes:
-                for safe in safes:
-                    self.mark_safe(safe)
-            if mines:
-                for mine in mines:
-                    self.mark_mine(mine)
-            if not (safes or mines):
-                final_knowledge.append(s)
+            if not s.cells:
+                continue
+            key = s.key()
+            if key in seen:
+                continue
+            seen.add(key)
+            final_knowledge.append(s)
         self.knowledge = final_knowledge
+        self._kb_keys = seen
 
 
     def make_safe_move(self):
@@ -292,16 +432,7 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        # for move in self.safes:
-        #     if move not in self.moves_made:
-        #         return move
-        # return None
-    
-        safeCells = self.safes - self.moves_made
-        if not safeCells:
-            return None
-        move = safeCells.pop()
-        return move
+        return next(iter(self._available_safes), None)
 
 
     def make_random_move(self):
@@ -311,14 +442,7 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        possible_moves = []
-        for i in range(self.height):
-            for j in range(self.width):
-                possible_moves.append((i, j))
-
-        while len(possible_moves) != 0:
-            random_move = random.choice(possible_moves)
-            possible_moves.remove(random_move)
-            if random_move not in self.moves_made and random_move not in self.mines:
-                return random_move
-        return None
\ No newline at end of file
+        possible_moves = self._all_cells - self.moves_made - self.mines
+        if not possible_moves:
+            return None
+        return random.choice(tuple(possible_moves))
\ No newline at end of file